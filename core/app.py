@@ -1,31 +1,67 @@
+import asyncio
 import time
+from contextlib import asynccontextmanager
 
+import httpx
+import orjson
 from fastapi import APIRouter, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import HTMLResponse, ORJSONResponse, Response
 from fastapi.openapi.docs import get_swagger_ui_html
 from fastapi.openapi.utils import get_openapi
+from pymongo.errors import PyMongoError
 
 from core.logger import Logger
+from core.middleware import RequestLoggingMiddleware
 from utils.data.mongo import MongoManager
 
 
 class App:
+    HEALTH_CACHE_TTL = 2.0
+
     def __init__(self):
         self.app = FastAPI(
             title="Coders For Coders API",
             docs_url=None,
             redoc_url=None,
             openapi_url=None,
-            version="0.1"
+            version="0.1",
+            default_response_class=ORJSONResponse,
+            lifespan=self._lifespan
         )
         self._configure_cors()
         self.logger = Logger()
         self.db = MongoManager("cfc_db")
-        self.app.middleware("http")(self.log_requests)
+        # Outbound client shared by the OAuth routers; the long keepalive lets
+        # connections warmed at login survive until the provider's callback
+        self.http_client = httpx.AsyncClient(
+            http2=True,
+            timeout=10.0,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=100, keepalive_expiry=60.0)
+        )
+        self.app.add_middleware(RequestLoggingMiddleware)
+        # Database failures surface here instead of through per-endpoint try/except blocks
+        self.app.add_exception_handler(PyMongoError, self._handle_database_error)
+        self._docs_html = get_swagger_ui_html(
+            openapi_url="/openapi.json",
+            title="API Documentation",
+            swagger_favicon_url="https://fastapi.tiangolo.com/img/favicon.png"
+        ).body
+        self._openapi_json: bytes | None = None
+        self._health_cache: tuple[float, dict | None] = (0.0, None)
 
         self.app.get("/api/docs")(self.get_docs)
         self.app.get("/openapi.json")(self.get_openapi_schema)
 
+    @asynccontextmanager
+    async def _lifespan(self, app: FastAPI):
+        yield
+        await self.http_client.aclose()
+
+    async def _handle_database_error(self, request: Request, exc: PyMongoError) -> ORJSONResponse:
+        self.logger.error(f"Database error on {request.method} {request.url.path}: {str(exc)}")
+        return ORJSONResponse({"detail": "Database error"}, status_code=500)
+
     def _configure_cors(self):
         self.app.add_middleware(
             CORSMiddleware,
@@ -36,31 +72,18 @@ class App:
         )
 
     async def get_openapi_schema(self):
-        openapi_schema = get_openapi(
-            title="Coders For Coders API",
-            version="0.0.1",
-            description="API for the Coders For Coders project",
-            routes=self.app.routes
-        )
-        return openapi_schema
+        if self._openapi_json is None:
+            self.app.openapi_schema = get_openapi(
+                title="Coders For Coders API",
+                version="0.0.1",
+                description="API for the Coders For Coders project",
+                routes=self.app.routes
+            )
+            self._openapi_json = orjson.dumps(self.app.openapi_schema)
+        return Response(content=self._openapi_json, media_type="application/json")
 
     async def get_docs(self):
-        return get_swagger_ui_html(
-            openapi_url="/openapi.json",
-            title="API Documentation",
-            swagger_favicon_url="https://fastapi.tiangolo.com/img/favicon.png"
-        )
-
-    async def log_requests(self, request: Request, call_next):
-        start_time = time.time()
-        response = await call_next(request)
-        duration = time.time() - start_time
-        self.logger.info(
-            f"request: {request.method} - {request.url.path} "
-            f"status: {response.status_code} "
-            f"duration: {duration:.2f}s"
-        )
-        return response
+        return HTMLResponse(content=self._docs_html)
 
     def configure_routes(self, routers: list[APIRouter]):
         for router in routers:
@@ -76,9 +99,14 @@ class App:
         return self.db.client
 
     async def health_check(self):
+        # Healthy results are reused briefly so frequent probes don't each hit Mongo
+        checked_at, cached = self._health_cache
+        now = time.monotonic()
+        if cached and now - checked_at < self.HEALTH_CACHE_TTL:
+            return cached
         try:
-            server_info = await self.db.client.server_info()
-            return {
+            server_info = await asyncio.wait_for(self.db.client.server_info(), timeout=1.5)
+            result = {
                 "status": "healthy",
                 "database": {
                     "status": "connected",
@@ -88,6 +116,19 @@ class App:
                 "api_version": self.app.version,
                 "api_title": self.app.title
             }
+            self._health_cache = (now, result)
+            return result
+        except asyncio.TimeoutError:
+            self.logger.warning("Health check failed: server_info timeout")
+            return {
+                "status": "unhealthy",
+                "database": {
+                    "status": "disconnected",
+                    "error": "server_info timeout"
+                },
+                "api_version": self.app.version,
+                "api_title": self.app.title
+            }
         except Exception as e:
             self.logger.error(f"Health check failed: {str(e)}")
             return {
@@ -1,8 +1,49 @@
+import atexit
+import functools
 import logging
+import logging.handlers
+import queue
 import sys
-from typing import Optional
+import threading
+import time
 from uvicorn.server import logger as uvicorn_logger
 
+class BufferedFileHandler(logging.FileHandler):
+    """File handler that batches writes and flushes at most every ``flush_interval`` seconds"""
+
+    def __init__(self, filename: str, buffer_size: int = 64 * 1024, flush_interval: float = 0.2):
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self._last_flush = time.monotonic()
+        self._stop_flushing = threading.Event()
+        super().__init__(filename)
+        self._flusher = threading.Thread(target=self._flush_periodically, daemon=True)
+        self._flusher.start()
+
+    def _open(self):
+        return open(self.baseFilename, self.mode, buffering=self.buffer_size, encoding=self.encoding)
+
+    def _flush_periodically(self):
+        while not self._stop_flushing.wait(self.flush_interval):
+            self._flush_stream()
+
+    def _flush_stream(self):
+        with self.lock:
+            if self.stream and not self.stream.closed:
+                self.stream.flush()
+            self._last_flush = time.monotonic()
+
+    def flush(self):
+        # Called after every record; the buffer spills on its own once it is full
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self._flush_stream()
+
+    def close(self):
+        self._stop_flushing.set()
+        self._flush_stream()
+        super().close()
+
+
 class Logger:
     _instance = None
     def __new__(cls):
@@ -14,6 +55,12 @@ class Logger:
     def _initialize_logger(self):
         self.logger = logging.getLogger("cfc.api")
         self.logger.setLevel(logging.INFO)
+        # Bind the logging methods directly to skip a wrapper frame per call
+        self.info = self.logger.info
+        self.error = functools.partial(self.logger.error, exc_info=True)
+        self.warning = self.logger.warning
+        self.debug = self.logger.debug
+        self.critical = self.logger.critical
         uvicorn_logger.handlers = self.logger.handlers
         uvicorn_logger.setLevel(self.logger.level)
         uvicorn_logger.name = self.logger.name
@@ -25,28 +72,22 @@ class Logger:
                 datefmt='%Y-%m-%d %H:%M:%S'
             )
         )
-        self.logger.addHandler(console_handler)
 
-        file_handler = logging.FileHandler("app.log")
+        file_handler = BufferedFileHandler("app.log")
         file_handler.setFormatter(
             logging.Formatter(
                 '%(asctime)s | %(levelname)s | %(name)s | %(message)s',
                 datefmt='%Y-%m-%d %H:%M:%S'
             )
         )
-        self.logger.addHandler(file_handler)
-
-    def info(self, message: str):
-        self.logger.info(message)
-
-    def error(self, message: str, exc_info: Optional[bool] = True):
-        self.logger.error(message, exc_info=exc_info)
 
-    def warning(self, message: str):
-        self.logger.warning(message)
-
-    def debug(self, message: str):
-        self.logger.debug(message)
-
-    def critical(self, message: str):
-        self.logger.critical(message)
\ No newline at end of file
+        # Handlers run on a background thread so request paths only enqueue records
+        log_queue = queue.Queue(-1)
+        self.logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        self._listener = logging.handlers.QueueListener(
+            log_queue, console_handler, file_handler, respect_handler_level=True
+        )
+        self._listener.start()
+        # atexit runs in reverse order: drain the queue first, then flush the file buffer
+        atexit.register(file_handler.close)
+        atexit.register(self._listener.stop)
@@ -0,0 +1,33 @@
+import logging
+import time
+
+from core.logger import Logger
+
+
+class RequestLoggingMiddleware:
+    """Pure ASGI middleware that logs method, path, status and duration of every HTTP request"""
+
+    def __init__(self, app):
+        self.app = app
+        self.logger = Logger()
+        self.log_info = self.logger.info
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.logger.logger.isEnabledFor(logging.INFO):
+            return await self.app(scope, receive, send)
+
+        start_time = time.perf_counter()
+        status_code = None
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+        duration = time.perf_counter() - start_time
+        self.log_info(
+            "request: %s - %s status: %s duration: %.2fs",
+            scope["method"], scope["path"], status_code, duration
+        )
@@ -1,9 +1,13 @@
 import dotenv
 
 from fastapi import APIRouter
-from fastapi.responses import HTMLResponse
 import uvicorn
 
+try:
+    import uvloop  # noqa: F401
+    LOOP = "uvloop"
+except ImportError:  # uvloop is not available on Windows
+    LOOP = "asyncio"
 
 from core.app import App
 from core.logger import Logger
@@ -13,6 +17,7 @@ from routes.data.data import DataRouter
 
 dotenv.load_dotenv()
 
+
 class APIServer:
     def __init__(self):
         self.app = App()
@@ -22,27 +27,16 @@ class APIServer:
     def _setup_routers(self):
      
         self.data_router = DataRouter()
-        self.github_router = GithubAuthRouter()
-        self.discord_router = DiscordAuthRouter()
+        self.github_router = GithubAuthRouter(self.app.http_client)
+        self.discord_router = DiscordAuthRouter(self.app.http_client)
         
         self.app.configure_routes([
             self.data_router.router,
             self.github_router.router,
             self.discord_router.router,
-            self._docs_router(),
             self._health_router()
         ])
 
-    def _docs_router(self) -> APIRouter:
-        """Create and configure documentation router"""
-        docs_router = APIRouter(prefix="/api")
-        docs_router.add_api_route(
-            path="/docs",
-            endpoint=lambda: HTMLResponse(content=open("./docs/docs.html").read()),
-            methods=["GET"]
-        )
-        return docs_router
-
     def _health_router(self) -> APIRouter:
         """Create and configure health check router"""
         health_router = APIRouter(prefix="/api")
@@ -59,7 +53,13 @@ class APIServer:
                 self.app.get_application(),
                 host="0.0.0.0",
                 port=8000,
-                log_config=None
+                log_config=None,
+                loop=LOOP,
+                http="httptools",
+                access_log=False,
+                proxy_headers=False,
+                server_header=False,
+                date_header=False
             )
         except Exception as e:
             self.logger.error(f"Failed to start server: {str(e)}")
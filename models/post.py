@@ -1,6 +1,6 @@
 from datetime import datetime
 from typing import Optional, List
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 class PostMetadata(BaseModel):
     """Contains metadata about the post like creation date and type"""
@@ -30,6 +30,21 @@ class PostContent(BaseModel):
 
 class Post(BaseModel):
     """Represents a complete post with metadata and content"""
+    model_config = ConfigDict(frozen=True)
+
     id: str = Field(description="Unique identifier for the post")
     metadata: PostMetadata = Field(description="Metadata about the post")
     content: PostContent = Field(description="Content of the post")
+
+class PostSummaryContent(BaseModel):
+    """The subset of post content shown in post listings"""
+    title: str = Field(description="Title of the post")
+    description: str = Field(description="Short description for preview")
+
+class PostSummary(BaseModel):
+    """A post as shown in listings, without the full content"""
+    model_config = ConfigDict(frozen=True)
+
+    id: str = Field(description="Unique identifier for the post")
+    metadata: PostMetadata = Field(description="Metadata about the post")
+    content: PostSummaryContent = Field(description="Preview content of the post")
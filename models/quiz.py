@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import List
 
 class Option(BaseModel):
@@ -14,6 +14,21 @@ class QuestionContent(BaseModel):
 
 class Question(BaseModel):
     """Represents a complete quiz question with metadata and content."""
+    model_config = ConfigDict(frozen=True)
+
+    id: str
+    category: str
+    question: QuestionContent
+
+class QuestionPrompt(BaseModel):
+    """The content of a quiz question as listed to players, without the correct answer."""
+    text: str
+    options: List[Option]
+
+class QuestionSummary(BaseModel):
+    """A quiz question as listed to players, without the correct answer."""
+    model_config = ConfigDict(frozen=True)
+
     id: str
     category: str
-    question: QuestionContent
\ No newline at end of file
+    question: QuestionPrompt
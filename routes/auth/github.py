@@ -1,40 +1,92 @@
+import asyncio
+import functools
+import hashlib
 import os
+import time
+from contextlib import asynccontextmanager
 from typing import Optional
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlencode
 from uuid import UUID, uuid4
 
 from fastapi import APIRouter, HTTPException, Request, Response
-from fastapi.responses import RedirectResponse
+from fastapi.responses import ORJSONResponse, RedirectResponse
 import httpx
+from cachetools import TTLCache
 
 import jwt
+import orjson
+from pymongo import ReturnDocument
+from pymongo.errors import PyMongoError
 
-from utils.data.mongo import MongoManager
+from core.logger import Logger
+from routes.auth.indexes import AUTH_INDEXES, auth_db
 from models.user import User, Session
 
+# Users resolved from session cookies, keyed by the token's SHA-256 digest so raw
+# tokens are not retained. The short TTL bounds how long a revoked session lingers.
+_user_cache: TTLCache = TTLCache(maxsize=5_000, ttl=60)
+
+_ONE_DAY = timedelta(days=1)
+_ONE_DAY_SECONDS = 86400
+_STATE_TOKEN_TTL_SECONDS = 300
+# Matches the shared client's keepalive_expiry; warming more often would not keep connections any longer
+_WARMUP_INTERVAL_SECONDS = 60.0
+
+# Static header sets; per-request calls only add the Authorization header
+_JSON_HEADERS = {"Accept": "application/json"}
+_GITHUB_API_HEADERS = {"Accept": "application/vnd.github+json", "X-GitHub-Api-Version": "2022-11-28"}
+
 
 class GithubAuthRouter:
-    def __init__(self):
+    __slots__ = (
+        "router", "client_id", "client_secret", "callback_url", "jwt_secret",
+        "decode_jwt_in_executor", "org_name", "_github_authorize_url", "http",
+        "_warmup_tasks", "_last_warmup", "db", "users_collection", "sessions_collection",
+        "_session_cache", "logger",
+    )
+
+    def __init__(self, http_client: httpx.AsyncClient):
         """Initialize the GitHub authentication router with required config"""
 
-        self.router = APIRouter(prefix="/api/auth")
+        self.router = APIRouter(prefix="/api/auth", default_response_class=ORJSONResponse, lifespan=self._lifespan)
+        self.logger = Logger()
         self.client_id = os.getenv("GH_CLIENT_ID")
         self.client_secret = os.getenv("GH_CLIENT_SECRET") 
         self.callback_url = os.getenv("GH_CALLBACK_URL")
         self.jwt_secret = os.getenv("JWT_SECRET_KEY")
+        # Verifying in a worker thread only pays off at several thousand requests per second
+        self.decode_jwt_in_executor = os.getenv("JWT_DECODE_IN_EXECUTOR", "").lower() in ("1", "true")
         self.org_name = "coders-for-coders"
+        # Only the state token varies per login; it is appended in github_login
+        self._github_authorize_url = "https://github.com/login/oauth/authorize?" + urlencode({
+            "client_id": self.client_id,
+            "redirect_uri": self.callback_url,
+            "scope": "read:user,user:email,read:org"
+        })
         
-        # Configure httpx client with timeouts and limits
-        self.client_config = {
-            "timeout": 10.0,
-            "limits": httpx.Limits(max_keepalive_connections=5, max_connections=10)
-        }
+        # Shared httpx client so GitHub connections are kept alive between requests
+        self.http = http_client
+        self._warmup_tasks: set[asyncio.Task] = set()
+        self._last_warmup = float("-inf")
         
         # Initialize MongoDB connection
-        self.db = MongoManager("auth_db")
+        self.db = auth_db()
+        self.users_collection = self.db.get_collection("users")
+        self.sessions_collection = self.db.get_collection("sessions")
+        self._session_cache: TTLCache = TTLCache(maxsize=10_000, ttl=60)
         
         self._setup_routes()
 
+    @asynccontextmanager
+    async def _lifespan(self, app):
+        """Ensure the auth_db indexes shared with the Discord router exist before serving requests"""
+        try:
+            await self.db.ensure_indexes(AUTH_INDEXES)
+        except PyMongoError as e:
+            self.logger.warning(f"Failed to create auth indexes: {str(e)}")
+        yield
+
     def _setup_routes(self):
         """Configure API routes"""
         self.router.add_api_route(path="/github/login", endpoint=self.github_login, methods=["GET"])
@@ -44,15 +96,9 @@ class GithubAuthRouter:
 
     async def github_login(self) -> RedirectResponse:
         
+        self._warm_connections()
         state = self._generate_state_token()
-        github_auth_url = (
-            f"https://github.com/login/oauth/authorize"
-            f"?client_id={self.client_id}"
-            f"&redirect_uri={self.callback_url}"
-            f"&state={state}"
-            f"&scope=read:user,user:email,read:org"
-        )
-        response = RedirectResponse(url=github_auth_url)
+        response = RedirectResponse(url=f"{self._github_authorize_url}&state={state}")
         response.set_cookie(
             key="oauth_state",
             value=state,
@@ -63,12 +109,32 @@ class GithubAuthRouter:
         )
         return response
 
+    def _warm_connections(self):
+        """Open connections to GitHub in the background ahead of the OAuth callback"""
+        # Logins are unauthenticated, so warm at most once per keepalive window to avoid amplifying traffic
+        now = time.monotonic()
+        if self._warmup_tasks or now - self._last_warmup < _WARMUP_INTERVAL_SECONDS:
+            return
+        self._last_warmup = now
+        task = asyncio.create_task(self._prime_connections())
+        self._warmup_tasks.add(task)
+        task.add_done_callback(self._warmup_tasks.discard)
+
+    async def _prime_connections(self):
+        """Complete DNS, TCP and TLS setup to the hosts used by github_callback"""
+        await asyncio.gather(
+            self.http.head("https://github.com", timeout=2.0),
+            self.http.head("https://api.github.com/zen", timeout=2.0),
+            return_exceptions=True
+        )
+
     def _generate_state_token(self) -> str:
         
+        now = int(time.time())
         return jwt.encode(
             {
-                "exp": datetime.utcnow() + timedelta(minutes=5),
-                "iat": datetime.utcnow(),
+                "exp": now + _STATE_TOKEN_TTL_SECONDS,
+                "iat": now,
             },
             self.jwt_secret,
             algorithm="HS256"
@@ -82,79 +148,75 @@ class GithubAuthRouter:
             
         token_url = "https://github.com/login/oauth/access_token"
         
-        async with httpx.AsyncClient(**self.client_config) as client:
-            try:
-                token_response = await client.post(
-                    token_url,
-                    data={
-                        "client_id": self.client_id,
-                        "client_secret": self.client_secret,
-                        "code": code,
-                    },
-                    headers={"Accept": "application/json"}
-                )
-                token_response.raise_for_status()
-                token_data = token_response.json()
-
-                access_token = token_data.get("access_token")
-                if not access_token:
-                    raise HTTPException(status_code=400, detail="Failed to get access token")
-
-                user_response = await client.get(
-                    "https://api.github.com/user",
-                    headers={
-                        "Authorization": f"Bearer {access_token}",
-                        "Accept": "application/json"
-                    }
-                )
-                user_response.raise_for_status()
-                user_data = user_response.json()
-
-                email_response = await client.get(
-                    "https://api.github.com/user/emails",
-                    headers={
-                        "Authorization": f"Bearer {access_token}",
-                        "Accept": "application/json"
-                    }
-                )
-                email_response.raise_for_status()
-                primary_email = next(
-                    (email for email in email_response.json() if email["primary"]),
-                    None
-                )
-
-                user = await self._upsert_user({
-                    "github_id": user_data["id"],
-                    "username": user_data["login"],
-                    "email": primary_email["email"] if primary_email else None,
-                    "avatar": user_data.get("avatar_url")
-                })
+        try:
+            token_response = await self.http.post(
+                token_url,
+                data={
+                    "client_id": self.client_id,
+                    "client_secret": self.client_secret,
+                    "code": code,
+                },
+                headers=_JSON_HEADERS
+            )
+            token_response.raise_for_status()
+            token_data = orjson.loads(token_response.content)
+
+            access_token = token_data.get("access_token")
+            if not access_token:
+                raise HTTPException(status_code=400, detail="Failed to get access token")
+
+            auth_headers = {**_JSON_HEADERS, "Authorization": f"Bearer {access_token}"}
+            user_data, email = await self._fetch_profile(auth_headers)
+
+            user = await self._upsert_user({
+                "github_id": user_data["id"],
+                "username": user_data["login"],
+                "email": email,
+                "avatar": user_data.get("avatar_url")
+            })
                 
-                session = await self._create_session(user.id, access_token)
+            session = await self._create_session(user.id, access_token)
                 
-                token = self._generate_jwt(user.id)
-                response.set_cookie(
-                    key="session",
-                    value=token,
-                    httponly=True,
-                    secure=True,
-                    samesite="lax",
-                    max_age=86400  # 24 hours
-                )
-
-                return {
-                    "status": "success",
-                    "user": {
-                        "id": str(user.id),
-                        "username": user.username,
-                        "email": user.email,
-                        "avatar": user.avatar
-                    }
+            token = self._generate_jwt(user.id)
+            response.set_cookie(
+                key="session",
+                value=token,
+                httponly=True,
+                secure=True,
+                samesite="lax",
+                max_age=86400  # 24 hours
+            )
+
+            return {
+                "status": "success",
+                "user": {
+                    "id": str(user.id),
+                    "username": user.username,
+                    "email": user.email,
+                    "avatar": user.avatar
                 }
+            }
+
+        except httpx.HTTPError as e:
+            self.logger.error(f"GitHub OAuth callback failed: {str(e)}")
+            raise HTTPException(status_code=400, detail=str(e))
 
-            except httpx.HTTPError as e:
-                print(e)
-                raise HTTPException(status_code=400, detail=str(e))
+    async def _fetch_profile(self, headers: dict) -> tuple[dict, Optional[str]]:
+        """Fetch the GitHub profile, and the user's emails only when the profile has no public email"""
+        user_response = await self.http.get("https://api.github.com/user", headers=headers)
+        user_response.raise_for_status()
+        user_data = orjson.loads(user_response.content)
+
+        email = user_data.get("email")
+        if email is None:
+            email_response = await self.http.get("https://api.github.com/user/emails", headers=headers)
+            email_response.raise_for_status()
+            primary_email = next(
+                (email for email in orjson.loads(email_response.content) if email["primary"]),
+                None
+            )
+            email = primary_email["email"] if primary_email else None
+        return user_data, email
 
     async def get_current_user(self, request: Request) -> User:
         """Get the current authenticated user"""
@@ -162,13 +224,17 @@ class GithubAuthRouter:
         if not token:
             raise HTTPException(status_code=401, detail="No session token provided")
             
+        cache_key = hashlib.sha256(token.encode()).digest()
+        cached_user = _user_cache.get(cache_key)
+        if cached_user is not None:
+            return cached_user
+
         try:
-            payload = jwt.decode(token, self.jwt_secret, algorithms=["HS256"])
+            payload = await self._decode_jwt(token)
             user_id = UUID(payload["sub"])
-            user = await self.db.get_document("users", str(user_id))
-            if not user:
-                raise HTTPException(status_code=404, detail="User not found")
-            return User(**user)
+            user = await self._get_user(user_id)
+            _user_cache[cache_key] = user
+            return user
         except (jwt.InvalidTokenError, KeyError):
             raise HTTPException(status_code=401, detail="Invalid session token")
 
@@ -179,106 +245,115 @@ class GithubAuthRouter:
             raise HTTPException(status_code=401, detail="No session token provided")
             
         try:
-            payload = jwt.decode(token, self.jwt_secret, algorithms=["HS256"])
+            payload = await self._decode_jwt(token)
             user_id = payload["sub"]
             session = await self._get_session(user_id)
             access_token = session.access_token
         except (jwt.InvalidTokenError, KeyError):
             raise HTTPException(status_code=401, detail="Invalid session token")
 
-        async with httpx.AsyncClient(**self.client_config) as client:
-            try:
-                user_response = await client.get(
-                    "https://api.github.com/user",
-                    headers={
-                        "Authorization": f"Bearer {access_token}",
-                        "Accept": "application/json"
-                    }
-                )
-                user_response.raise_for_status()
-                user_data = user_response.json()
-
-                invite_response = await client.post(
-                    f"https://api.github.com/orgs/{self.org_name}/invitations",
-                    headers={
-                        "Authorization": f"Bearer {access_token}",
-                        "Accept": "application/vnd.github+json",
-                        "X-GitHub-Api-Version": "2022-11-28"
-                    },
-                    json={
-                        "invitee_id": user_data["id"],
-                        "role": "direct_member"
-                    }
-                )
-                invite_response.raise_for_status()
-
-                return {"message": f"Invitation sent to join {self.org_name}"}
-
-            except httpx.HTTPError as e:
-                raise HTTPException(status_code=400, detail=str(e))
+        # The GitHub id is stored on the user at login, so no GET /user is needed
+        user = _user_cache.get(hashlib.sha256(token.encode()).digest()) or await self._get_user(user_id)
+        if user.github_id is None:
+            raise HTTPException(status_code=400, detail="No GitHub account linked")
+
+        try:
+            invite_response = await self.http.post(
+                f"https://api.github.com/orgs/{self.org_name}/invitations",
+                headers={**_GITHUB_API_HEADERS, "Authorization": f"Bearer {access_token}"},
+                json={
+                    "invitee_id": user.github_id,
+                    "role": "direct_member"
+                }
+            )
+            invite_response.raise_for_status()
+
+            return {"message": f"Invitation sent to join {self.org_name}"}
+
+        except httpx.HTTPError as e:
+            raise HTTPException(status_code=400, detail=str(e))
 
     def _generate_jwt(self, user_id: UUID) -> str:
         """Generate JWT token for user session"""
+        now = int(time.time())
         return jwt.encode(
             {
                 "sub": str(user_id),
-                "exp": datetime.utcnow() + timedelta(days=1),
-                "iat": datetime.utcnow(),
+                "exp": now + _ONE_DAY_SECONDS,
+                "iat": now,
             },
             self.jwt_secret,
             algorithm="HS256"
         )
 
+    async def _decode_jwt(self, token: str) -> dict:
+        """Verify a session token, off the event loop when JWT_DECODE_IN_EXECUTOR is set"""
+        decode = functools.partial(jwt.decode, token, self.jwt_secret, algorithms=["HS256"])
+        if self.decode_jwt_in_executor:
+            return await asyncio.get_running_loop().run_in_executor(None, decode)
+        return decode()
+
     async def _upsert_user(self, user_data: dict) -> User:
         """Create or update user record in database"""
-        now = datetime.utcnow()
+        now = datetime.now(timezone.utc)
         
-        existing_user = await self.db.get_collection("users").find_one(
-            {"github_id": user_data["github_id"]}
+        # Single atomic round-trip: update profile fields, set identity fields only on insert
+        user = await self.users_collection.find_one_and_update(
+            {"github_id": user_data["github_id"]},
+            {
+                "$set": {
+                    "username": user_data["username"],
+                    "email": user_data["email"],
+                    "avatar": user_data.get("avatar"),
+                    "updated_at": now
+                },
+                "$setOnInsert": {
+                    "id": str(uuid4()),
+                    "github_id": user_data["github_id"],
+                    "created_at": now
+                }
+            },
+            upsert=True,
+            return_document=ReturnDocument.AFTER
         )
-        
-        if existing_user:
-            user_id = existing_user["_id"]
-            update_data = {
-                "username": user_data["username"],
-                "email": user_data["email"],
-                "avatar": user_data.get("avatar"),
-                "updated_at": now
-            }
-            updated_user = await self.db.update_document("users", str(user_id), update_data)
-            return User(**updated_user)
-        else:
-            # Create new user
-            new_user_data = {
-                "github_id": user_data["github_id"],
-                "username": user_data["username"],
-                "email": user_data["email"],
-                "avatar": user_data.get("avatar"),
-                "created_at": now,
-                "updated_at": now
-            }
-            created_user = await self.db.create_document("users", new_user_data)
-            return User(**created_user)
+        return User(**user)
 
     async def _create_session(self, user_id: UUID, access_token: str) -> Session:
         """Create new session record in database"""
-        now = datetime.utcnow()
+        now = datetime.now(timezone.utc)
         session_data = {
             "id": str(uuid4()),
             "user_id": str(user_id),
             "access_token": access_token,
-            "expires_at": now + timedelta(days=1)
+            "expires_at": now + _ONE_DAY
         }
-        created_session = await self.db.create_document("sessions", session_data)
-        return Session(**created_session)
+        # The session id is a plain uuid field; Mongo assigns _id, as for users
+        await self.sessions_collection.insert_one(session_data)
+        session_data.pop("_id", None)
+        session = Session(**session_data)
+        self._session_cache[str(user_id)] = session
+        return session
 
     async def _get_session(self, user_id: UUID) -> Session:
         """Retrieve active session for user"""
-        session = await self.db.get_collection("sessions").find_one({
-            "user_id": str(user_id),
-            "expires_at": {"$gt": datetime.utcnow()}
-        })
+        now = datetime.now(timezone.utc)
+        cached = self._session_cache.get(str(user_id))
+        if cached is not None and cached.expires_at > now:
+            return cached
+
+        session = await self.sessions_collection.find_one(
+            {"user_id": str(user_id), "expires_at": {"$gt": now}},
+            projection={"_id": 0}
+        )
         if not session:
             raise HTTPException(status_code=401, detail="No active session found")
-        session["id"] = str(session.pop("_id"))
-        return Session(**session)
\ No newline at end of file
+        session = Session(**session)
+        self._session_cache[str(user_id)] = session
+        return session
+
+    async def _get_user(self, user_id: UUID) -> User:
+        """Retrieve user by ID"""
+        user = await self.users_collection.find_one({"id": str(user_id)})
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        return User(**user)
\ No newline at end of file
@@ -0,0 +1,22 @@
+from pymongo import IndexModel
+
+from utils.data.mongo import MongoManager
+
+def auth_db() -> MongoManager:
+    """The auth_db handle shared by every OAuth router; sessions compare tz-aware expiry times"""
+    return MongoManager("auth_db", tz_aware=True)
+
+
+# Every OAuth router reads and writes these auth_db collections
+AUTH_INDEXES = {
+    "users": [
+        IndexModel("discord_id", unique=True, sparse=True),
+        IndexModel("github_id", unique=True, sparse=True),
+    ],
+    "sessions": [
+        IndexModel([("user_id", 1), ("expires_at", -1)]),
+        # Expired sessions are purged by Mongo, which keeps the lookup index small
+        IndexModel("expires_at", expireAfterSeconds=0),
+    ],
+}
+
@@ -1,26 +1,119 @@
-from typing import Optional
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
 
-import traceback
-
-from fastapi import APIRouter, HTTPException, Request
-from datetime import datetime, timedelta
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from datetime import datetime, timedelta, timezone
 from uuid import UUID, uuid4
 import jwt
+import orjson
+from pydantic import TypeAdapter
+from pymongo import IndexModel
+from pymongo.errors import OperationFailure, PyMongoError
 
-from models.post import Post
-from models.quiz import Question
+from core.logger import Logger
+from models.post import Post, PostSummary
+from models.quiz import Question, QuestionSummary
 from models.user import User, Session
-from utils.data.mongo import MongoManager
+from utils.data.cache import CacheManager
+from utils.data.mongo import MongoManager, model_projection, parse_object_id
+
+_POST_ADAPTER = TypeAdapter(Post)
+_POST_SUMMARY_ADAPTER = TypeAdapter(PostSummary)
+_POST_SUMMARIES_ADAPTER = TypeAdapter(list[PostSummary])
+_QUESTION_ADAPTER = TypeAdapter(Question)
+_QUESTION_SUMMARY_ADAPTER = TypeAdapter(QuestionSummary)
+_QUESTION_SUMMARIES_ADAPTER = TypeAdapter(list[QuestionSummary])
+
+# Reads only fetch the fields their models carry, so stored extras never reach clients (even with
+# TRUST_DB_DOCS) and answers never leave the server in a list
+_POST_PROJECTION = model_projection(Post)
+_POST_LIST_PROJECTION = model_projection(PostSummary)
+_QUESTION_PROJECTION = model_projection(Question)
+_QUESTION_LIST_PROJECTION = model_projection(QuestionSummary)
+
+# OperationFailure code for "$changeStream is only supported on replica sets"
+_CHANGE_STREAMS_UNSUPPORTED = {40573}
+_WATCH_RETRY_MIN_SECONDS = 1.0
+_WATCH_RETRY_MAX_SECONDS = 60.0
+
+_PAGE_SIZE = 100
+_MAX_PAGE_SIZE = 500
+
+
+def _oid_ts_iso(id: str) -> str:
+    """ISO creation time of an ObjectId hex string, read from its leading 4-byte timestamp"""
+    return datetime.fromtimestamp(int(id[:8], 16), tz=timezone.utc).isoformat()
 
 
 class DataRouter:
+    __slots__ = (
+        "router", "quiz", "posts", "users", "users_collection", "cache",
+        "jwt_secret", "trust_db_docs", "logger",
+    )
+
     def __init__(self):
-        self.router: APIRouter = APIRouter(prefix="/api/data")
+        self.router: APIRouter = APIRouter(prefix="/api/data", default_response_class=ORJSONResponse, lifespan=self._lifespan)
+        self.logger = Logger()
+        self.jwt_secret = os.getenv("JWT_SECRET_KEY")
+        # Documents are validated on write, so reads may skip re-validating them. Fields missing
+        # from a stored document are then left out instead of being filled with model defaults
+        self.trust_db_docs = os.getenv("TRUST_DB_DOCS", "").lower() in ("1", "true")
         self.quiz: MongoManager = MongoManager("quiz_db")
         self.posts: MongoManager = MongoManager("posts_db")
         self.users: MongoManager = MongoManager("users_db")
+        self.users_collection = self.users.get_collection("users")
+        self.cache: CacheManager = CacheManager()
         self._setup_routes()
 
+    @asynccontextmanager
+    async def _lifespan(self, app):
+        """Ensure the indexes used by the data routes exist and watch for writes while serving requests"""
+        try:
+            await self.posts.ensure_indexes({"posts": [IndexModel([("metadata.type", 1), ("_id", -1)])]})
+        except PyMongoError as e:
+            self.logger.warning(f"Failed to create posts indexes: {str(e)}")
+        watchers = [
+            asyncio.create_task(self._watch_invalidations(self.posts, "posts", "posts")),
+            asyncio.create_task(self._watch_invalidations(self.quiz, "python", "questions")),
+        ] if self.cache.enabled else []
+        yield
+        for watcher in watchers:
+            watcher.cancel()
+        await asyncio.gather(*watchers, return_exceptions=True)
+        await self.cache.close()
+
+    async def _watch_invalidations(self, db: MongoManager, collection_name: str, prefix: str):
+        """Drop cached entries as soon as Mongo reports a write, including writes made outside this API"""
+        delay = _WATCH_RETRY_MIN_SECONDS
+        while True:
+            try:
+                # An invalidate event (after a drop or rename) closes the stream, so it is reopened
+                async with db.get_collection(collection_name).watch() as stream:
+                    delay = _WATCH_RETRY_MIN_SECONDS
+                    async for change in stream:
+                        document_key = change.get("documentKey")
+                        if document_key is None:
+                            # drop, rename, dropDatabase and invalidate affect the whole collection
+                            await self._invalidate_all(prefix)
+                        else:
+                            await self._invalidate(prefix, str(document_key["_id"]))
+                continue
+            except OperationFailure as e:
+                if e.code in _CHANGE_STREAMS_UNSUPPORTED:
+                    # Standalone servers can't serve change streams; the cache TTL still bounds staleness
+                    self.logger.warning(
+                        f"Change streams are not supported here, not watching {collection_name}: {str(e)}"
+                    )
+                    return
+                self.logger.warning(f"Watching {collection_name} for cache invalidation failed, retrying: {str(e)}")
+            except Exception as e:
+                self.logger.error(f"Watching {collection_name} for cache invalidation failed, retrying: {str(e)}")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, _WATCH_RETRY_MAX_SECONDS)
+
     def _setup_routes(self):
         """
         Setup the routes for the data router.
@@ -29,14 +122,14 @@ class DataRouter:
             path="/post",
             endpoint=self.get_post,
             methods=["GET"],
-            response_model=list[Post] | Post,
+            response_model=list[PostSummary] | Post,
         )
 
         self.router.add_api_route(
             path= "/quiz/question",
             endpoint=self.get_question,
             methods=["GET"],
-            response_model=Question | list[Question]
+            response_model=Question | list[QuestionSummary]
         )
 
         self.router.add_api_route(
@@ -64,6 +157,57 @@ class DataRouter:
             response_model=User
         )
 
+    @staticmethod
+    def _json_response(content: bytes) -> Response:
+        """Return pre-serialized JSON, bypassing FastAPI's re-validation and jsonable_encoder"""
+        return Response(content=content, media_type="application/json")
+
+    async def _cached_json(self, key: str, load: Callable[[], Awaitable[Any]], adapter: TypeAdapter) -> Response:
+        """Serve the cached payload for key, or load, validate and cache it on a miss"""
+        content = await self.cache.get(key)
+        if content is None:
+            value = await load()
+            if self.trust_db_docs:
+                content = orjson.dumps(value)
+            else:
+                content = adapter.dump_json(adapter.validate_python(value))
+            await self.cache.set(key, content)
+        return self._json_response(content)
+
+    def _ndjson_response(self, documents: AsyncIterator[dict], adapter: TypeAdapter) -> StreamingResponse:
+        """Stream documents as NDJSON, one validated line per document as the cursor yields it"""
+        async def lines():
+            async for document in documents:
+                if self.trust_db_docs:
+                    yield orjson.dumps(document) + b"\n"
+                else:
+                    yield adapter.dump_json(adapter.validate_python(document)) + b"\n"
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    async def _item_key(self, prefix: str, id: str) -> str:
+        """Cache key for one document, using the canonical ObjectId so differently cased ids share it"""
+        generation = await self.cache.generation(prefix)
+        return f"{prefix}:id:{generation}:{parse_object_id(id)}"
+
+    async def _list_key(self, prefix: str, *params: Any) -> str:
+        """Cache key for one list page, scoped to the current list generation of prefix"""
+        generation = await self.cache.generation(f"{prefix}:list")
+        return ":".join((f"{prefix}:list:{generation}", *map(str, params)))
+
+    async def _invalidate(self, prefix: str, id: str | None = None):
+        """Drop the cached item and retire every cached list under prefix after a write"""
+        await asyncio.gather(
+            self.cache.delete(*([await self._item_key(prefix, id)] if id else [])),
+            self.cache.bump_generation(f"{prefix}:list")
+        )
+
+    async def _invalidate_all(self, prefix: str):
+        """Retire every cached item and list under prefix"""
+        await asyncio.gather(
+            self.cache.bump_generation(prefix),
+            self.cache.bump_generation(f"{prefix}:list")
+        )
+
     async def get_current_user(self, request: Request) -> User:
         """Get the currently logged in user's data"""
         token = request.cookies.get("session")
@@ -74,7 +218,7 @@ class DataRouter:
             payload = jwt.decode(token, self.jwt_secret, algorithms=["HS256"])
             user_id = payload["sub"]
             
-            user = await self.users.get_collection("users").find_one({"id": user_id})
+            user = await self.users_collection.find_one({"id": user_id})
             if not user:
                 raise HTTPException(status_code=404, detail="User not found")
 
@@ -83,39 +227,43 @@ class DataRouter:
 
         except jwt.InvalidTokenError:
             raise HTTPException(status_code=401, detail="Invalid session token")
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=str(e))
 
-    async def get_post(self, id: str | None = None, type: str | None = None) -> list[Post] | Post:
+    async def get_post(
+        self,
+        id: str | None = None,
+        type: str | None = None,
+        skip: int = Query(0, ge=0),
+        limit: int = Query(_PAGE_SIZE, ge=1, le=_MAX_PAGE_SIZE),
+        stream: bool = False
+    ) -> list[PostSummary] | Post:
         """
-        Get a post by ID or get all posts of a specific type.
+        Get a post by ID or get a page of posts of a specific type.
 
         Args:
             id (Optional[str]): The ID of the post to fetch.
             type (Optional[str]): The type of posts to fetch.
+            skip (int): Number of posts to skip, newest first.
+            limit (int): Maximum number of posts to return.
+            stream (bool): Stream the list as NDJSON instead of a cached JSON array.
 
         Returns:
-            Union[List[Post], Post]: Either a single post or list of posts.
+            Union[List[PostSummary], Post]: Either a single post or list of post summaries.
         """
-        try:
-            if id:
-                post = await self.posts.get_document_by_id("posts", id)
-                if not post:
-                    raise HTTPException(status_code=404, detail="Post not found")
-                post["id"] = str(post.pop("_id"))
-                return Post(**post)
-            else:
-                filter = {"type": type} if type else {}
-                posts = await self.posts.get_all_documents("posts", filter)
-                for post in posts:
-                    post["id"] = str(post.pop("_id"))
-                return [Post(**post) for post in posts]
-        except HTTPException as e:
-            raise e
-        except Exception as e:
-            raise HTTPException(
-                status_code=500, 
-                detail="Failed to fetch post" if id else "An error occurred while fetching posts"
+        if id:
+            return await self._cached_json(
+                await self._item_key("posts", id),
+                lambda: self.posts.get_document_by_id("posts", id, _POST_PROJECTION),
+                _POST_ADAPTER
+            )
+        else:
+            filter = {"metadata.type": type} if type else {}
+            page = {"skip": skip, "limit": limit, "projection": _POST_LIST_PROJECTION}
+            if stream:
+                return self._ndjson_response(self.posts.iter_documents("posts", filter, **page), _POST_SUMMARY_ADAPTER)
+            return await self._cached_json(
+                await self._list_key("posts", type or "all", skip, limit),
+                lambda: self.posts.get_all_documents("posts", filter, **page),
+                _POST_SUMMARIES_ADAPTER
             )
 
     async def create_post(self, post: Post) -> dict:
@@ -128,21 +276,19 @@ class DataRouter:
         Returns:
             dict: Response containing created post ID and details
         """
-        try:
-            post_dict = post.model_dump(mode="json", exclude={"id"})
-            created = await self.posts.create_document("posts", post_dict)
-            return {
-                "status": "success",
-                "message": "Post created successfully",
-                "id": str(created["_id"]),
-                "post": {
-                    "title": created["content"]["title"],
-                    "type": created["metadata"]["type"],
-                    "created_at": created["_id"].generation_time.isoformat()
-                }
+        post_dict = post.model_dump(mode="python", exclude={"id"})
+        created = await self.posts.create_document("posts", post_dict)
+        await self._invalidate("posts")
+        return {
+            "status": "success",
+            "message": "Post created successfully",
+            "id": created["id"],
+            "post": {
+                "title": created["content"]["title"],
+                "type": created["metadata"]["type"],
+                "created_at": _oid_ts_iso(created["id"])
             }
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Failed to create resource")
+        }
 
     async def update_post(self, post: Post, id: Optional[str] = None) -> Post:
         """
@@ -155,51 +301,51 @@ class DataRouter:
         Returns:
             Resource: The updated resource.
         """
-        try:
-            if not id:
-                raise HTTPException(status_code=400, detail="Post ID is required")
-            post_dict = post.model_dump(mode="json", exclude={"id"})
-            updated = await self.posts.update_document("posts", id, post_dict)
-            updated["id"] = str(updated.pop("_id"))
-            return Post(**updated)
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Failed to update post")
+        if not id:
+            raise HTTPException(status_code=400, detail="Post ID is required")
+        post_dict = post.model_dump(mode="python", exclude={"id"})
+        updated = await self.posts.update_document("posts", id, post_dict)
+        await self._invalidate("posts", id)
+        return self._json_response(Post.model_validate(updated).model_dump_json())
 
     async def delete_post(self, id: Optional[str] = None) -> dict[str, str]:
-        try:
-            if not id:
-                raise HTTPException(status_code=400, detail="Post ID is required")
-            await self.posts.delete_document("posts", id)
-            return {"message": "Post deleted successfully"}
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Failed to delete post")
-
-    async def get_question(self, id: str | None = None) -> Question | list[Question]:
+        if not id:
+            raise HTTPException(status_code=400, detail="Post ID is required")
+        await self.posts.delete_document("posts", id)
+        await self._invalidate("posts", id)
+        return {"message": "Post deleted successfully"}
+
+    async def get_question(
+        self,
+        id: str | None = None,
+        skip: int = Query(0, ge=0),
+        limit: int = Query(_PAGE_SIZE, ge=1, le=_MAX_PAGE_SIZE),
+        stream: bool = False
+    ) -> Question | list[QuestionSummary]:
         """
-        Get a quiz question by ID or get all questions.
+        Get a quiz question by ID or get a page of questions.
 
         Args:
             id (Optional[str]): The ID of the question to fetch.
+            skip (int): Number of questions to skip, in insertion order.
+            limit (int): Maximum number of questions to return.
+            stream (bool): Stream the list as NDJSON instead of a cached JSON array.
 
         Returns:
-            Union[Question, List[Question]]: Either a single question or list of questions.
+            Union[Question, List[QuestionSummary]]: Either a single question or list of questions without answers.
         """
-        try:
-            if id:
-                question = await self.quiz.get_document_by_id("python", id)
-                if not question:
-                    raise HTTPException(status_code=404, detail="Question not found")
-                return Question(**question)
-            else:
-                questions = await self.quiz.get_all_documents("python")
-                if not questions:
-                    return []
-                return [Question(**q) for q in questions]
-        except HTTPException as e:
-            raise e
-        except Exception as e:
-            print(f"Error traceback: {traceback.format_exc()}")
-            raise HTTPException(
-                status_code=500,
-                detail=f"Failed to fetch question{'s' if not id else ''}"
+        if id:
+            return await self._cached_json(
+                await self._item_key("questions", id),
+                lambda: self.quiz.get_document_by_id("python", id, _QUESTION_PROJECTION),
+                _QUESTION_ADAPTER
+            )
+        else:
+            page = {"skip": skip, "limit": limit, "sort": [("_id", 1)], "projection": _QUESTION_LIST_PROJECTION}
+            if stream:
+                return self._ndjson_response(self.quiz.iter_documents("python", **page), _QUESTION_SUMMARY_ADAPTER)
+            return await self._cached_json(
+                await self._list_key("questions", skip, limit),
+                lambda: self.quiz.get_all_documents("python", **page),
+                _QUESTION_SUMMARIES_ADAPTER
             )
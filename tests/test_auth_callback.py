@@ -0,0 +1,91 @@
+import os
+import unittest
+from datetime import datetime, timezone
+
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret-at-least-32-bytes-long")
+
+import httpx
+import orjson
+from bson.objectid import ObjectId
+from fastapi import Response
+
+from routes.auth.discord import DiscordAuthRouter
+from routes.auth.github import GithubAuthRouter
+
+
+class FakeUsers:
+    """Stands in for the users collection, returning the upserted user document"""
+
+    async def find_one_and_update(self, filter, update, **kwargs):
+        now = datetime.now(timezone.utc)
+        return {
+            "_id": ObjectId(),
+            **update["$setOnInsert"],
+            **update["$set"],
+            "created_at": now,
+        }
+
+
+class FakeSessions:
+    """Stands in for the sessions collection, assigning _id on insert like Mongo does"""
+
+    def __init__(self):
+        self.inserted = []
+
+    async def insert_one(self, document):
+        document["_id"] = ObjectId()
+        self.inserted.append(dict(document))
+
+
+def _provider(request: httpx.Request) -> httpx.Response:
+    routes = {
+        "/login/oauth/access_token": {"access_token": "gh-token"},
+        "/user": {"id": 42, "login": "octocat", "email": "octo@example.com", "avatar_url": None},
+        "/api/oauth2/token": {"access_token": "discord-token"},
+        "/api/users/@me": {"id": "1234", "username": "wumpus", "email": None, "avatar": None},
+    }
+    if request.url.path not in routes:
+        return httpx.Response(404)
+    return httpx.Response(200, content=orjson.dumps(routes[request.url.path]))
+
+
+class OAuthCallbackTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.http = httpx.AsyncClient(transport=httpx.MockTransport(_provider))
+        self.sessions = FakeSessions()
+
+    async def asyncTearDown(self):
+        await self.http.aclose()
+
+    def _assert_session_created(self, result: dict, access_token: str):
+        self.assertEqual(result["status"], "success")
+        self.assertEqual(len(self.sessions.inserted), 1)
+        session = self.sessions.inserted[0]
+        self.assertIsInstance(session["_id"], ObjectId)
+        self.assertEqual(session["access_token"], access_token)
+        self.assertEqual(session["user_id"], result["user"]["id"])
+
+    async def test_github_callback_creates_session(self):
+        router = GithubAuthRouter(self.http)
+        router.users_collection = FakeUsers()
+        router.sessions_collection = self.sessions
+
+        result = await router.github_callback("code", "state", None, Response())
+
+        self._assert_session_created(result, "gh-token")
+        cached = router._session_cache[result["user"]["id"]]
+        self.assertEqual(str(cached.id), self.sessions.inserted[0]["id"])
+
+    async def test_discord_callback_creates_session(self):
+        router = DiscordAuthRouter(self.http)
+        router.users_collection = FakeUsers()
+        router.sessions_collection = self.sessions
+
+        result = await router.discord_callback("code", Response())
+
+        self._assert_session_created(result, "discord-token")
+
+
+if __name__ == "__main__":
+    unittest.main()
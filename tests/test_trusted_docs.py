@@ -0,0 +1,101 @@
+import os
+import unittest
+from datetime import datetime
+from unittest import mock
+
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+
+import orjson
+from bson.objectid import ObjectId
+
+from routes.data.data import DataRouter
+
+POST_ID = ObjectId()
+STORED_POST = {
+    "_id": POST_ID,
+    "legacy_views": 1200,
+    "metadata": {
+        "created_at": datetime(2024, 1, 1),
+        "updated_at": None,
+        "type": "article",
+        "icon": None,
+        "author": "octocat",
+        "tags": ["python"],
+        "moderation_note": "internal",
+    },
+    "content": {
+        "title": "Title",
+        "description": "Preview",
+        "long_description": None,
+        "content": "Body",
+        "images": None,
+        "likes": 3,
+        "comments": [
+            {"id": "c1", "author": "a", "content": "hi", "created_at": datetime(2024, 1, 2), "ip": "10.0.0.1"},
+        ],
+    },
+}
+
+
+def _project(document, projection: dict):
+    """Apply an inclusion projection of dotted paths the way Mongo does, keeping _id"""
+    if isinstance(document, list):
+        return [_project(item, projection) for item in document]
+    result = {"_id": document["_id"]} if "_id" in document else {}
+    heads = {}
+    for path in projection:
+        head, _, rest = path.partition(".")
+        heads.setdefault(head, []).append(rest)
+    for head, rests in heads.items():
+        if head not in document:
+            continue
+        if "" in rests:
+            result[head] = document[head]
+        else:
+            result[head] = _project(document[head], dict.fromkeys(rests, 1))
+    return result
+
+
+class FakeCursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    async def to_list(self, length=None):
+        return self.documents
+
+
+class FakePosts:
+    """Runs the $project and _id renaming stages of the read pipelines against one stored post"""
+
+    def aggregate(self, pipeline, **kwargs):
+        document = dict(STORED_POST)
+        for stage in pipeline:
+            if "$project" in stage and stage["$project"] != {"_id": 0}:
+                document = _project(document, stage["$project"])
+            elif "$addFields" in stage:
+                document["id"] = str(document["_id"])
+            elif stage.get("$project") == {"_id": 0}:
+                document.pop("_id")
+        return FakeCursor([document])
+
+
+class TrustedDocsTests(unittest.IsolatedAsyncioTestCase):
+    async def _get_post(self, trusted: bool) -> dict:
+        router = DataRouter()
+        router.trust_db_docs = trusted
+        with mock.patch.object(router.posts, "get_collection", return_value=FakePosts()):
+            response = await router.get_post(id=str(POST_ID), type=None, skip=0, limit=10, stream=False)
+        return orjson.loads(response.body)
+
+    async def test_trusted_post_matches_validated_post(self):
+        self.assertEqual(await self._get_post(trusted=True), await self._get_post(trusted=False))
+
+    async def test_trusted_post_omits_stored_extras(self):
+        post = await self._get_post(trusted=True)
+        self.assertNotIn("legacy_views", post)
+        self.assertNotIn("moderation_note", post["metadata"])
+        self.assertNotIn("ip", post["content"]["comments"][0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import os
+from typing import Optional
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from core.logger import Logger
+
+
+class CacheManager:
+    """Redis cache for pre-serialized JSON payloads; a no-op when REDIS_URL is not set"""
+    _instance = None
+    DEFAULT_TTL = 300
+    SOCKET_TIMEOUT = 0.25
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._initialize_connection()
+        return cls._instance
+
+    def _initialize_connection(self):
+        self.logger = Logger()
+        redis_url = os.getenv("REDIS_URL")
+        # Short timeouts turn a hung Redis into a prompt RedisError, i.e. a cache miss
+        self._client: Optional[Redis] = Redis.from_url(
+            redis_url,
+            socket_connect_timeout=self.SOCKET_TIMEOUT,
+            socket_timeout=self.SOCKET_TIMEOUT
+        ) if redis_url else None
+
+    @property
+    def enabled(self) -> bool:
+        return self._client is not None
+
+    async def get(self, key: str) -> Optional[bytes]:
+        # Redis failures are treated as misses so reads fall back to MongoDB
+        if self._client is None:
+            return None
+        try:
+            return await self._client.get(key)
+        except RedisError as e:
+            self.logger.warning(f"Cache read failed for {key}: {str(e)}")
+            return None
+
+    async def set(self, key: str, value: bytes, ttl: int = DEFAULT_TTL):
+        if self._client is None:
+            return
+        try:
+            await self._client.setex(key, ttl, value)
+        except RedisError as e:
+            self.logger.warning(f"Cache write failed for {key}: {str(e)}")
+
+    async def delete(self, *keys: str):
+        if self._client is None or not keys:
+            return
+        try:
+            await self._client.delete(*keys)
+        except RedisError as e:
+            self.logger.warning(f"Cache invalidation failed: {str(e)}")
+
+    async def generation(self, namespace: str) -> int:
+        """Current generation of namespace; embedding it in keys lets bump_generation retire them all at once"""
+        if self._client is None:
+            return 0
+        try:
+            return int(await self._client.get(f"{namespace}:generation") or 0)
+        except RedisError as e:
+            self.logger.warning(f"Cache read failed for {namespace}:generation: {str(e)}")
+            return 0
+
+    async def bump_generation(self, namespace: str):
+        """Orphan every key built from the current generation; they expire through their TTL"""
+        if self._client is None:
+            return
+        try:
+            await self._client.incr(f"{namespace}:generation")
+        except RedisError as e:
+            self.logger.warning(f"Cache invalidation failed for {namespace}: {str(e)}")
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
@@ -1,6 +1,10 @@
+import asyncio
 import os
-from typing import Dict, List, Optional
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, List, Optional, get_args
 
+from bson.binary import UuidRepresentation
+from bson.codec_options import CodecOptions
 from bson.objectid import ObjectId
 from fastapi import HTTPException
 from motor.motor_asyncio import (
@@ -8,27 +12,89 @@ from motor.motor_asyncio import (
     AsyncIOMotorCollection,
     AsyncIOMotorDatabase,
 )
+from pydantic import BaseModel
+from pymongo import IndexModel, ReturnDocument
+from pymongo.errors import BulkWriteError
+
+
+@lru_cache(maxsize=1024)
+def parse_object_id(id: str) -> ObjectId:
+    """Parse a document id, reusing the ObjectId for recently seen ids and rejecting malformed ones with a 400"""
+    if not ObjectId.is_valid(id):
+        raise HTTPException(status_code=400, detail="Invalid id")
+    return ObjectId(id)
+
+
+def model_projection(model: type[BaseModel], path: str = "") -> Dict[str, int]:
+    """Inclusion projection of every field of model, descending into nested models and lists of them"""
+    projection: Dict[str, int] = {}
+    for name, field in model.model_fields.items():
+        nested = [arg for arg in (field.annotation, *get_args(field.annotation))
+                  if isinstance(arg, type) and issubclass(arg, BaseModel)]
+        if nested:
+            projection.update(model_projection(nested[0], f"{path}{name}."))
+        else:
+            projection[f"{path}{name}"] = 1
+    return projection
+
+
+# Aggregation stages that rename _id to a string id server-side, so documents arrive already shaped
+_ID_AS_STRING_STAGES: List[Dict[str, Any]] = [
+    {"$addFields": {"id": {"$toString": "$_id"}}},
+    {"$project": {"_id": 0}},
+]
+
 
 class MongoManager:
     _instances: Dict[str, 'MongoManager'] = {}
+    # One connection pool shared by every database handle in the process
+    _shared_client: Optional[AsyncIOMotorClient] = None
+
+    # Pool and timeout settings passed to the shared AsyncIOMotorClient
+    DEFAULT_CLIENT_OPTIONS: Dict[str, Any] = {
+        "maxPoolSize": 100,
+        "minPoolSize": 5,
+        "maxIdleTimeMS": 30000,
+        "serverSelectionTimeoutMS": 2000,
+        "connectTimeoutMS": 5000,
+        "socketTimeoutMS": 10000,
+        "retryWrites": True,
+        "w": "majority",
+        "uuidRepresentation": "standard",
+    }
     
-    def __new__(cls, database_name: str):
+    def __new__(cls, database_name: str, **codec_options: Any):
         if database_name not in cls._instances:
             instance = super(MongoManager, cls).__new__(cls)
             instance._client = None
             instance._database = None 
             instance._collections = {}
-            instance._initialize_connection(database_name)
+            instance._codec_options = codec_options
+            instance._initialize_connection(database_name, **codec_options)
             cls._instances[database_name] = instance
-        return cls._instances[database_name]
-
-    def _initialize_connection(self, database_name: str):
-        mongodb_url = os.getenv("MONGODB_URI")
-        if not mongodb_url:
-            raise ValueError("MONGODB_URI environment variable not set")
-            
-        self._client = AsyncIOMotorClient(mongodb_url)
-        self._database = self._client.get_database(database_name)
+        instance = cls._instances[database_name]
+        # The handle is shared per name, so a caller asking for different decoding options would silently get the first ones
+        if codec_options != instance._codec_options:
+            raise ValueError(
+                f"MongoManager({database_name!r}) already exists with codec options {instance._codec_options}, "
+                f"not {codec_options}"
+            )
+        return instance
+
+    def _initialize_connection(self, database_name: str, **codec_options: Any):
+        cls = self.__class__
+        if cls._shared_client is None:
+            mongodb_url = os.getenv("MONGODB_URI")
+            if not mongodb_url:
+                raise ValueError("MONGODB_URI environment variable not set")
+            cls._shared_client = AsyncIOMotorClient(mongodb_url, **cls.DEFAULT_CLIENT_OPTIONS)
+
+        self._client = cls._shared_client
+        # Per-database decoding options (e.g. tz_aware) apply to this handle only, not the shared client
+        self._database = self._client.get_database(
+            database_name,
+            codec_options=CodecOptions(uuid_representation=UuidRepresentation.STANDARD, **codec_options)
+        ) if codec_options else self._client.get_database(database_name)
         self._collections = {}
 
     @property
@@ -44,81 +110,129 @@ class MongoManager:
         return self._database
 
     def get_collection(self, collection_name: str) -> AsyncIOMotorCollection:
-        if collection_name not in self._collections:
+        # Single dict lookup on the hot path; the collection handle is only built on first use
+        try:
+            return self._collections[collection_name]
+        except KeyError:
             if self._database is None:
                 raise ValueError("MongoDB database not initialized")
-            self._collections[collection_name] = self._database.get_collection(collection_name)
-        return self._collections[collection_name]
+            collection = self._collections[collection_name] = self._database.get_collection(collection_name)
+            return collection
 
-    async def get_all_documents(self, collection_name: str, filter_query: dict | None = None) -> list[dict]:
-        try:
-            collection = self.get_collection(collection_name)
-            documents = await collection.find(filter_query or {}).to_list(length=None)
-            for doc in documents:
-                doc['id'] = str(doc.pop('_id'))
-            return documents
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Failed to fetch documents: {str(e)}")
-
-    async def get_document_by_id(self, collection_name: str, id: str) -> dict:
-        try:
-            collection = self.get_collection(collection_name)
-            document = await collection.find_one({"_id": ObjectId(id)})
-            if not document:
-                raise HTTPException(status_code=404, detail="Document not found")
-            document['id'] = str(document.pop('_id'))
-            return document
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Failed to fetch document: {str(e)}")
+    async def ensure_indexes(self, indexes: Dict[str, List[IndexModel]]):
+        """Create the given indexes per collection; indexes that already exist are left untouched"""
+        await asyncio.gather(*(
+            self.get_collection(collection_name).create_indexes(models)
+            for collection_name, models in indexes.items()
+        ))
+
+    @staticmethod
+    def _page_pipeline(
+        filter_query: dict | None = None,
+        skip: int = 0,
+        limit: int | None = None,
+        sort: List[tuple[str, int]] | None = None,
+        projection: Dict[str, Any] | None = None
+    ) -> List[Dict[str, Any]]:
+        """Build the aggregation for one page of matching documents, newest first unless a sort is given"""
+        pipeline: List[Dict[str, Any]] = [
+            {"$match": filter_query or {}},
+            {"$sort": dict(sort or [("_id", -1)])},
+        ]
+        if skip:
+            pipeline.append({"$skip": skip})
+        if limit:
+            pipeline.append({"$limit": limit})
+        if projection:
+            pipeline.append({"$project": projection})
+        return pipeline + _ID_AS_STRING_STAGES
+
+    async def get_all_documents(self, collection_name: str, filter_query: dict | None = None, **page: Any) -> list[dict]:
+        """Fetch one page of matching documents; see _page_pipeline for the paging options"""
+        collection = self.get_collection(collection_name)
+        pipeline = self._page_pipeline(filter_query, **page)
+        return await collection.aggregate(pipeline).to_list(length=page.get("limit"))
+
+    async def iter_documents(
+        self,
+        collection_name: str,
+        filter_query: dict | None = None,
+        batch_size: int = 100,
+        **page: Any
+    ) -> AsyncIterator[dict]:
+        """Yield one page of matching documents as the cursor's batches arrive"""
+        collection = self.get_collection(collection_name)
+        pipeline = self._page_pipeline(filter_query, **page)
+        async for document in collection.aggregate(pipeline, batchSize=batch_size):
+            yield document
+
+    async def get_document_by_id(self, collection_name: str, id: str, projection: Dict[str, Any] | None = None) -> dict:
+        collection = self.get_collection(collection_name)
+        pipeline = [{"$match": {"_id": parse_object_id(id)}}, *([{"$project": projection}] if projection else []), *_ID_AS_STRING_STAGES]
+        documents = await collection.aggregate(pipeline).to_list(length=1)
+        if not documents:
+            raise HTTPException(status_code=404, detail="Document not found")
+        return documents[0]
 
     async def create_document(self, collection_name: str, document_data: dict) -> dict:
+        collection = self.get_collection(collection_name)
+        document_data['_id'] = ObjectId(document_data.pop('id', None))
+        await collection.insert_one(document_data)
+        document_data['id'] = str(document_data.pop('_id'))
+        return document_data
+
+    async def bulk_create(self, collection_name: str, documents: list[dict]) -> tuple[list[dict], list[dict]]:
+        """Insert many documents in one round-trip; returns (inserted, failed), where each failure carries its error"""
+        collection = self.get_collection(collection_name)
+        prepared = [
+            {'_id': ObjectId(document.get('id')), **{k: v for k, v in document.items() if k != 'id'}}
+            for document in documents
+        ]
+        errors: dict[int, str] = {}
         try:
-            collection = self.get_collection(collection_name)
-            document_data['_id'] = ObjectId(document_data.pop('id', None))
-            result = await collection.insert_one(document_data)
-            created = await collection.find_one({"_id": result.inserted_id})
-            if not created:
-                raise HTTPException(status_code=500, detail="Failed to create document")
-            created['id'] = str(created.pop('_id'))
-            return created
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Failed to create document: {str(e)}")
+            # Unordered, so a failed document (e.g. a duplicate key) doesn't stop the rest
+            await collection.insert_many(prepared, ordered=False)
+        except BulkWriteError as e:
+            if not e.details.get("writeErrors"):
+                raise
+            errors = {error["index"]: error["errmsg"] for error in e.details["writeErrors"]}
+        inserted, failed = [], []
+        for index, document in enumerate(prepared):
+            document['id'] = str(document.pop('_id'))
+            if index in errors:
+                failed.append({"document": document, "error": errors[index]})
+            else:
+                inserted.append(document)
+        return inserted, failed
 
     async def update_document(self, collection_name: str, id: str, document_data: dict) -> dict:
-        try:
-            collection = self.get_collection(collection_name)
-            update_data = {k: v for k, v in document_data.items() if k != 'id'}
-            result = await collection.update_one(
-                {"_id": ObjectId(id)},
-                {"$set": update_data}
-            )
-            if result.modified_count == 0:
-                raise HTTPException(status_code=404, detail="Document not found")
-            
-            updated = await collection.find_one({"_id": ObjectId(id)})
-            if not updated:
-                raise HTTPException(status_code=500, detail="Failed to retrieve updated document")
-            updated['id'] = str(updated.pop('_id'))
-            return updated
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Failed to update document: {str(e)}")
+        collection = self.get_collection(collection_name)
+        update_data = {k: v for k, v in document_data.items() if k != 'id'}
+        updated = await collection.find_one_and_update(
+            {"_id": parse_object_id(id)},
+            {"$set": update_data},
+            return_document=ReturnDocument.AFTER
+        )
+        if not updated:
+            raise HTTPException(status_code=404, detail="Document not found")
+        updated['id'] = str(updated.pop('_id'))
+        return updated
 
     async def delete_document(self, collection_name: str, id: str) -> bool:
-        try:
-            collection = self.get_collection(collection_name)
-            result = await collection.delete_one({"_id": ObjectId(id)})
-            if result.deleted_count == 0:
-                raise HTTPException(status_code=404, detail="Document not found")
-            return True
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Failed to delete document: {str(e)}")
+        collection = self.get_collection(collection_name)
+        result = await collection.delete_one({"_id": parse_object_id(id)})
+        if result.deleted_count == 0:
+            raise HTTPException(status_code=404, detail="Document not found")
+        return True
 
     def close(self):
-        if self._client:
-            self._client.close()
-            self._client = None
-            self._database = None
-            self._collections = {}
-            if self in self.__class__._instances.values():
-                db_name = next(k for k, v in self.__class__._instances.items() if v == self)
-                del self.__class__._instances[db_name]
+        """Close the shared client, which invalidates every database handle built on it"""
+        cls = self.__class__
+        if cls._shared_client:
+            cls._shared_client.close()
+            cls._shared_client = None
+        for instance in cls._instances.values():
+            instance._client = None
+            instance._database = None
+            instance._collections = {}
+        cls._instances.clear()